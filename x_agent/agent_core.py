@@ -1,30 +1,261 @@
+import asyncio
+import collections
+import hashlib
 import logging
 import os
 import platform
 import re  # Added for stripping <think> tags
+import sqlite3
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 
-import chromadb
-import ollama
-from chromadb.config import Settings
+import numpy as np
 from news_fetcher import (
     NewsFetcher,  # Assuming news_fetcher.py is in the same directory
 )
-from sentence_transformers import SentenceTransformer
+
+# chromadb, ollama and the embedding backends are imported lazily in their
+# initializers: together they add seconds of cold import time that manual-entry
+# mode (or just reading --help) should not pay.
 
 # Configure logging
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
+# Resolved once: every helper that previously recomputed these paid
+# realpath-level syscalls per call.
+_SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+# The 'output' directory lives one level up from this script.
+_OUTPUT_DIR = os.path.join(_SCRIPT_DIR, "..", "output")
+
 # --- Configuration ---
 DB_DIRECTORY = "chroma_db"
 COLLECTION_NAME = "tweets"
+# Mirrors populate_db.py. Inner-product space over normalized vectors, with
+# HNSW parameters sized for a small (<100k item) corpus: a sparser graph
+# (M=8) is cheaper to build and walk, while search_ef=32 keeps recall high
+# for the n_results=3 lookups we do.
+COLLECTION_METADATA = {
+    "hnsw:space": "ip",
+    "hnsw:M": 8,
+    "hnsw:construction_ef": 64,
+    "hnsw:search_ef": 32,
+}
 EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"  # Consistent model for populating & querying
+# Directory (next to this script) holding the int8-quantized ONNX export of the
+# embedding model. Exported once on first run, then reloaded from disk.
+ONNX_MODEL_DIRECTORY = "onnx_model"
+ONNX_QUANTIZATION_CONFIG = "avx512_vnni"  # dynamic int8 GEMM on modern x86 CPUs
+ONNX_QUANTIZED_FILE_NAME = f"onnx/model_qint8_{ONNX_QUANTIZATION_CONFIG}.onnx"
+# "onnx" (quantized MiniLM, default) or "static" (model2vec token-lookup model).
+# Must match the backend used by populate_db.py so query and stored vectors
+# share the same space.
+EMBEDDING_BACKEND = os.environ.get("X_AGENT_EMBEDDING_BACKEND", "onnx")
+STATIC_EMBEDDING_MODEL_NAME = "minishlab/potion-base-8M"
+# On-disk cache of query embeddings (title -> float32 vector), so re-running
+# the CLI against the same articles skips the encoder entirely.
+EMBED_CACHE_FILENAME = "embed_cache.sqlite"
 OLLAMA_MODEL_NAME = "qwen3:1.7b"
 NEWS_API_KEY = os.environ.get("NEWS_API_KEY")
 # --- End Configuration ---
 
+# Compiled once; strips the model's <think>...</think> reasoning blocks.
+_THINK_RE = re.compile(r"<think>.*?</think>\s*", re.DOTALL)
+
+# Background workers for file writes + editor spawns, so saving one output
+# can overlap with generating the next.
+_IO_POOL = ThreadPoolExecutor(max_workers=2)
+
+# One HTTP client for all synchronous Ollama calls, so every chat/list/
+# generate reuses the same keep-alive connection to the local server
+# instead of re-establishing TCP per call. Honors OLLAMA_HOST, defaulting
+# to http://localhost:11434. Created on first use (see _get_ollama_client).
+_OLLAMA = None
+
+
+def _get_ollama_client():
+    global _OLLAMA
+    if _OLLAMA is None:
+        import ollama
+
+        _OLLAMA = ollama.Client()
+    return _OLLAMA
+
+
+_TWEET_PROMPT_TEMPLATE = """
+You are "Back to Basic," the AI personality behind a popular social media account on X (formerly Twitter).
+Your mission is to take current news articles and transform them into highly engaging, super-simplified explanations for a general audience. You're the knowledgeable yet approachable friend who breaks down complex stuff so anyone can get it, often with a relatable hook or a touch of lightheartedness.
+
+**Core "Back to Basic" Style Mandate:**
+(Mandate points 1-9 as before...)
+1.  **Hook 'Em Early:** Often start with a direct question (e.g., "What's happening with X?", "So, what's the deal with Y? 🤔") or a very brief, attention-grabbing statement about the news.
+2.  **Ultra-Simplicity:** Explain the core news as if you're talking to someone smart but completely unfamiliar with the topic. Define key terms or players if necessary (e.g., "The Federal Reserve ('the Fed') is America's central bank.").
+3.  **"Why it Matters" / "The Gist":** Crucially, explain *why* this news is important or relevant to the average person. How does it affect them or the world?
+4.  **Context is Key (Briefly!):** Provide just enough backstory or context to make the current event understandable (e.g., "For the past year or so, the Fed has been raising interest rates...").
+5.  **Anticipate Follow-up Questions:** Think about what a curious reader would ask next and try to address it concisely (e.g., "What investors are really listening for:", "Why are rate cuts often seen as positive?").
+6.  **Conversational & Engaging Tone:** Use a friendly, approachable, and conversational voice. A touch of humor or a relatable analogy is great where appropriate, but clarity is paramount. Avoid dry, academic, or overly formal language.
+7.  **Visual Appeal & X-Native:**
+    *   **Emojis:** Use relevant emojis strategically to add personality and break up text (📈, 🤔, 🌍).
+    *   **Hashtags:** ALWAYS include the signature `#BackToBasic`. Consider 1-2 other relevant, common hashtags if space allows.
+    *   **Conciseness:** Tweets must be suitable for X.
+8.  **Focus:** Distill the *single most important aspect* or the core development from the article for a general audience. Don't try to cover everything.
+9.  **No Jargon (or Explain It):** Avoid jargon. If a technical term is absolutely necessary, define it immediately in simple terms.
+
+Here are some relevant examples of past tweets that might help you with the style for this topic:
+--- BEGIN RELEVANT EXAMPLES ---
+{example_tweets_formatted}
+--- END RELEVANT EXAMPLES ---
+
+**Current News Item:**
+Headline: {article_title}
+Article Snippet/Key Information: {article_content}
+(This content should ideally be a concise summary or the most critical paragraphs of the news story you want to explain)
+
+Your post here:
+"""
+
+# The template is ~2KB of constant text around three dynamic fields. Split it
+# once at import so each call is a plain join instead of a full format parse
+# (which would also choke on any literal braces in the constant text).
+_PROMPT_HEAD, _rest = _TWEET_PROMPT_TEMPLATE.split("{example_tweets_formatted}")
+_PROMPT_MID, _rest = _rest.split("{article_title}")
+_PROMPT_TAIL1, _PROMPT_TAIL2 = _rest.split("{article_content}")
+del _rest
+
+
+class _OnnxQueryEncoder:
+    """Minimal MiniLM encoder on a raw onnxruntime session.
+
+    Replicates SentenceTransformer.encode for the query path (tokenize ->
+    transformer -> mean pool -> L2 normalize) without going through the
+    PyTorch dispatcher, which saves seconds of cold start and hundreds of
+    MB of RSS. Output vectors are identical in space to the populate_db
+    side, which still encodes with the full model.
+    """
+
+    # all-MiniLM-L6-v2's configured max sequence length.
+    _MAX_SEQ_LENGTH = 256
+
+    def __init__(self, model_dir, onnx_file):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        self._tokenizer = Tokenizer.from_file(
+            os.path.join(model_dir, "tokenizer.json")
+        )
+        self._tokenizer.enable_truncation(max_length=self._MAX_SEQ_LENGTH)
+        self._tokenizer.enable_padding()
+
+        sess_options = ort.SessionOptions()
+        sess_options.graph_optimization_level = (
+            ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        )
+        sess_options.intra_op_num_threads = os.cpu_count() or 1
+        self._session = ort.InferenceSession(
+            onnx_file, sess_options, providers=["CPUExecutionProvider"]
+        )
+        self._input_names = {i.name for i in self._session.get_inputs()}
+
+    def encode(self, sentences):
+        encodings = self._tokenizer.encode_batch(list(sentences))
+        input_ids = np.asarray([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.asarray(
+            [e.attention_mask for e in encodings], dtype=np.int64
+        )
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self._input_names:
+            feeds["token_type_ids"] = np.asarray(
+                [e.type_ids for e in encodings], dtype=np.int64
+            )
+        token_embeddings = self._session.run(None, feeds)[0]
+
+        # Mean pooling over non-padding tokens, then L2 normalization -- the
+        # same Pooling + Normalize modules all-MiniLM-L6-v2 ships with.
+        mask = attention_mask[:, :, None].astype(np.float32)
+        summed = (token_embeddings.astype(np.float32) * mask).sum(axis=1)
+        counts = np.clip(mask.sum(axis=1), 1e-9, None)
+        embeddings = summed / counts
+        norms = np.clip(
+            np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None
+        )
+        return embeddings / norms
+
+
+class _ThinkStreamFilter:
+    """Incrementally drops <think>...</think> blocks from streamed text.
+
+    feed() returns the user-visible part of each chunk as soon as it can be
+    proven to lie outside a think block (tag prefixes spanning chunk
+    boundaries are held back until resolved); flush() returns any remainder
+    once the stream ends.
+    """
+
+    _OPEN = "<think>"
+    _CLOSE = "</think>"
+
+    def __init__(self):
+        self._buffer = ""
+        self._in_think = False
+        self._strip_ws = False
+
+    def feed(self, chunk):
+        self._buffer += chunk
+        visible = []
+        while True:
+            if self._in_think:
+                end = self._buffer.find(self._CLOSE)
+                if end == -1:
+                    # Keep only what could be a partial close tag.
+                    self._buffer = self._buffer[-(len(self._CLOSE) - 1) :]
+                    break
+                self._buffer = self._buffer[end + len(self._CLOSE) :]
+                self._in_think = False
+                # Mirror the \s* in _THINK_RE: drop whitespace after the
+                # block even when it arrives in a later chunk.
+                self._strip_ws = True
+            else:
+                if self._strip_ws:
+                    self._buffer = self._buffer.lstrip()
+                    if not self._buffer:
+                        break
+                    self._strip_ws = False
+                start = self._buffer.find(self._OPEN)
+                if start == -1:
+                    # Everything but a possible partial open tag is safe.
+                    safe = len(self._buffer) - (len(self._OPEN) - 1)
+                    if safe > 0:
+                        visible.append(self._buffer[:safe])
+                        self._buffer = self._buffer[safe:]
+                    break
+                visible.append(self._buffer[:start])
+                self._buffer = self._buffer[start + len(self._OPEN) :]
+                self._in_think = True
+        return "".join(visible)
+
+    def flush(self):
+        remainder = "" if self._in_think else self._buffer
+        self._buffer = ""
+        self._in_think = False
+        self._strip_ws = False
+        return remainder
+
+# ChromaDB clients keyed by persist directory. Opening a persistent client
+# re-reads SQLite segments and HNSW indexes, so reuse one per path instead of
+# paying that cost for every TweetGeneratorAgent instance.
+_CLIENT_CACHE = {}
+
+
+def _get_chroma_client(db_full_path):
+    client = _CLIENT_CACHE.get(db_full_path)
+    if client is None:
+        import chromadb
+
+        client = chromadb.PersistentClient(path=db_full_path)
+        _CLIENT_CACHE[db_full_path] = client
+    return client
+
 
 class TweetGeneratorAgent:
     def __init__(self):
@@ -38,30 +269,102 @@ class TweetGeneratorAgent:
         self.embedding_model = None
         self.chroma_collection = None
         self.ollama_available = False
+        # LRU of (query_text, n_results) -> list of tweets; repeat queries
+        # (retries, re-selected articles) skip the embedding + HNSW search.
+        self._relevant_tweets_cache = collections.OrderedDict()
+        self._relevant_tweets_cache_maxsize = 256
+        self._embed_cache = None
 
         self._initialize_embedding_model()
         self._initialize_chroma_db()
+        self._initialize_embed_cache()
         self._check_ollama()
 
     def _initialize_embedding_model(self):
+        # The embedding forward pass is compute-bound GEMM; dockerized and
+        # interactive environments often default the math libraries to a
+        # single intra-op thread. Pin them to the available cores before the
+        # first torch/ORT initialization. (On hyperthreaded machines, capping
+        # at physical cores via OMP_NUM_THREADS can be slightly faster still.)
+        os.environ.setdefault("OMP_NUM_THREADS", str(os.cpu_count() or 4))
+
+        if EMBEDDING_BACKEND == "static":
+            # model2vec reduces embedding to a token lookup + mean pool (no
+            # transformer forward pass) -- orders of magnitude faster for the
+            # single short titles we embed per query. Requires the DB to have
+            # been populated with the same static model.
+            try:
+                from model2vec import StaticModel
+
+                logging.info(
+                    f"Loading static embedding model: {STATIC_EMBEDDING_MODEL_NAME}..."
+                )
+                self.embedding_model = StaticModel.from_pretrained(
+                    STATIC_EMBEDDING_MODEL_NAME
+                )
+                logging.info("Static embedding model loaded successfully.")
+                return
+            except Exception as e:
+                logging.warning(
+                    f"Could not load static embedding model ({e}). "
+                    "Falling back to the ONNX backend."
+                )
         try:
+            onnx_model_path = os.path.join(_SCRIPT_DIR, ONNX_MODEL_DIRECTORY)
+            quantized_file = os.path.join(onnx_model_path, ONNX_QUANTIZED_FILE_NAME)
+
+            if not os.path.exists(quantized_file):
+                # One-time export: load the ONNX backend once, quantize the
+                # linear layers to dynamic int8 and cache the result on disk.
+                logging.info(
+                    f"Exporting int8-quantized ONNX model for {EMBEDDING_MODEL_NAME} "
+                    f"to {onnx_model_path} (one-time operation)..."
+                )
+                from sentence_transformers import (
+                    SentenceTransformer,
+                    export_dynamic_quantized_onnx_model,
+                )
+
+                model = SentenceTransformer(EMBEDDING_MODEL_NAME, backend="onnx")
+                model.save_pretrained(onnx_model_path)
+                export_dynamic_quantized_onnx_model(
+                    model, ONNX_QUANTIZATION_CONFIG, onnx_model_path
+                )
+
             logging.info(
-                f"Loading sentence transformer model: {EMBEDDING_MODEL_NAME}..."
+                f"Loading int8-quantized ONNX embedding model from {onnx_model_path}..."
             )
-            self.embedding_model = SentenceTransformer(EMBEDDING_MODEL_NAME)
-            logging.info("Sentence transformer model loaded successfully.")
+            self.embedding_model = _OnnxQueryEncoder(onnx_model_path, quantized_file)
+            logging.info("Quantized ONNX embedding model loaded successfully.")
         except Exception as e:
-            logging.error(f"Failed to load sentence transformer model: {e}")
-            self.embedding_model = None
+            logging.warning(
+                f"Could not load/export quantized ONNX model ({e}). "
+                "Falling back to the default PyTorch backend."
+            )
+            try:
+                import torch
+                from sentence_transformers import SentenceTransformer
+
+                torch.set_num_threads(os.cpu_count() or 4)
+                try:
+                    torch.set_num_interop_threads(1)
+                except RuntimeError:
+                    pass  # interop pool already started; keep torch's choice
+
+                logging.info(
+                    f"Loading sentence transformer model: {EMBEDDING_MODEL_NAME}..."
+                )
+                self.embedding_model = SentenceTransformer(EMBEDDING_MODEL_NAME)
+                logging.info("Sentence transformer model loaded successfully.")
+            except Exception as e:
+                logging.error(f"Failed to load sentence transformer model: {e}")
+                self.embedding_model = None
 
     def _initialize_chroma_db(self):
         try:
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            db_full_path = os.path.join(script_dir, DB_DIRECTORY)
+            db_full_path = os.path.join(_SCRIPT_DIR, DB_DIRECTORY)
 
-            client = chromadb.Client(
-                Settings(persist_directory=db_full_path, is_persistent=True)
-            )
+            client = _get_chroma_client(db_full_path)
             try:
                 self.chroma_collection = client.get_collection(name=COLLECTION_NAME)
                 logging.info(
@@ -70,20 +373,96 @@ class TweetGeneratorAgent:
             except Exception:
                 logging.warning(
                     f"ChromaDB collection '{COLLECTION_NAME}' not found at {db_full_path}. "
-                    f"It may need to be created by running populate_db.py."
+                    f"Creating an empty one; run populate_db.py to fill it."
                 )
-                self.chroma_collection = None
+                try:
+                    self.chroma_collection = client.create_collection(
+                        name=COLLECTION_NAME,
+                        metadata=COLLECTION_METADATA,
+                    )
+                except Exception as e:
+                    logging.error(
+                        f"Could not create collection '{COLLECTION_NAME}': {e}"
+                    )
+                    self.chroma_collection = None
         except Exception as e:
             logging.error(f"Error initializing ChromaDB client: {e}")
             self.chroma_collection = None
 
+    def _initialize_embed_cache(self):
+        try:
+            cache_path = os.path.join(_SCRIPT_DIR, EMBED_CACHE_FILENAME)
+            self._embed_cache = sqlite3.connect(cache_path, check_same_thread=False)
+            self._embed_cache.execute(
+                "CREATE TABLE IF NOT EXISTS emb(k BLOB PRIMARY KEY, v BLOB)"
+            )
+            self._embed_cache.commit()
+            logging.info(f"Embedding cache ready at {cache_path}")
+        except Exception as e:
+            logging.warning(f"Could not open embedding cache: {e}")
+            self._embed_cache = None
+
+    @staticmethod
+    def _embed_cache_key(query_text):
+        # Include the backend so vectors from one model are never served for
+        # another after switching X_AGENT_EMBEDDING_BACKEND.
+        return hashlib.sha1(
+            f"{EMBEDDING_BACKEND}\x00{query_text}".encode("utf-8")
+        ).digest()
+
+    def _embed_cache_get(self, query_text):
+        if self._embed_cache is None:
+            return None
+        try:
+            row = self._embed_cache.execute(
+                "SELECT v FROM emb WHERE k = ?", (self._embed_cache_key(query_text),)
+            ).fetchone()
+            if row is None:
+                return None
+            return np.frombuffer(row[0], dtype=np.float32).reshape(1, -1)
+        except Exception as e:
+            logging.warning(f"Embedding cache read failed: {e}")
+            return None
+
+    def _embed_cache_put(self, query_text, embedding):
+        if self._embed_cache is None:
+            return
+        try:
+            self._embed_cache.execute(
+                "INSERT OR REPLACE INTO emb(k, v) VALUES (?, ?)",
+                (
+                    self._embed_cache_key(query_text),
+                    np.asarray(embedding, dtype=np.float32).tobytes(),
+                ),
+            )
+            self._embed_cache.commit()
+        except Exception as e:
+            logging.warning(f"Embedding cache write failed: {e}")
+
     def _check_ollama(self):
         try:
-            ollama.list()
+            _get_ollama_client().list()
             logging.info(
                 f"Ollama server is available. Ready to use model '{OLLAMA_MODEL_NAME}'."
             )
             self.ollama_available = True
+            try:
+                # One-token warmup so the first real generation doesn't pay
+                # the model load (GB-scale mmap + KV cache allocation);
+                # keep_alive keeps the weights resident between the tweet
+                # draft and image prompt calls.
+                _get_ollama_client().generate(
+                    model=OLLAMA_MODEL_NAME,
+                    prompt=" ",
+                    options={"num_predict": 1},
+                    keep_alive="30m",
+                )
+                logging.info(f"Model '{OLLAMA_MODEL_NAME}' warmed up and resident.")
+            except Exception as e:
+                logging.warning(
+                    f"Warmup of model '{OLLAMA_MODEL_NAME}' failed: {e}. "
+                    "First generation will load the model instead."
+                )
         except Exception as e:
             logging.error(
                 f"Ollama server not available or model '{OLLAMA_MODEL_NAME}' check failed: {e}"
@@ -97,49 +476,162 @@ class TweetGeneratorAgent:
                 "ChromaDB collection or embedding model not initialized. Cannot find relevant tweets."
             )
             return []
+
+        cache_key = (query_text, n_results)
+        cached = self._relevant_tweets_cache.get(cache_key)
+        if cached is not None:
+            self._relevant_tweets_cache.move_to_end(cache_key)
+            logging.info(
+                f"Returning {len(cached)} cached relevant tweets for query: '{query_text}'"
+            )
+            return list(cached)
+
         try:
-            query_embedding_list = self.embedding_model.encode([query_text])
-            if query_embedding_list is None or len(query_embedding_list) == 0:
-                logging.error("Failed to generate query embedding.")
-                return []
-            query_embedding = query_embedding_list[0]
+            query_embeddings = self._embed_cache_get(query_text)
+            if query_embeddings is None:
+                # Keep the embedding as a float32 ndarray end to end: Chroma
+                # accepts numpy directly, and its HNSW index stores float32,
+                # so a .tolist() round trip would just allocate ~dim floats.
+                query_embeddings = np.asarray(
+                    self.embedding_model.encode([query_text]), dtype=np.float32
+                )
+                if query_embeddings.size == 0:
+                    logging.error("Failed to generate query embedding.")
+                    return []
+                # The collection stores L2-normalized vectors in an
+                # inner-product space (see populate_db.py); normalizing the
+                # query up front keeps that valid for every backend and
+                # reduces each candidate distance to a single dot product.
+                norms = np.linalg.norm(query_embeddings, axis=1, keepdims=True)
+                query_embeddings = query_embeddings / np.clip(norms, 1e-12, None)
+                self._embed_cache_put(query_text, query_embeddings)
 
             results = self.chroma_collection.query(
-                query_embeddings=[query_embedding.tolist()],
+                query_embeddings=query_embeddings,
                 n_results=n_results,
-                include=["metadatas"],
+                include=["documents", "metadatas"],
             )
 
-            relevant_tweets = []
-            metadatas_outer_list = results.get("metadatas")
-            if metadatas_outer_list:
-                for metadata_list in metadatas_outer_list:
-                    if isinstance(metadata_list, list):
-                        for item_metadata in metadata_list:
-                            if item_metadata and "text" in item_metadata:
-                                relevant_tweets.append(item_metadata["text"])
+            # query returns documents/metadatas as [n_queries][n_results]; we
+            # issue one query, so index the outer lists directly.
+            relevant_tweets = self._texts_from_results(
+                (results.get("documents") or [[]])[0],
+                (results.get("metadatas") or [[]])[0],
+            )
 
             logging.info(
                 f"Found {len(relevant_tweets)} relevant tweets for query: '{query_text}'"
             )
+            self._relevant_tweets_cache[cache_key] = list(relevant_tweets)
+            if len(self._relevant_tweets_cache) > self._relevant_tweets_cache_maxsize:
+                self._relevant_tweets_cache.popitem(last=False)
             return relevant_tweets
         except Exception as e:
             logging.error(f"Error querying ChromaDB: {e}")
             return []
 
-    def generate_tweet_draft(
+    def find_relevant_tweets_batch(self, queries, n_results=3):
+        """Finds relevant tweets for many queries in one encode + kNN call.
+
+        Encoding the whole list at once amortizes tokenization and runs one
+        GEMM per batch instead of one per title, and Chroma batches the
+        multi-query search internally. The interactive path keeps using
+        find_relevant_tweets (which is cached per title).
+
+        :param queries: A list of query strings (e.g. article titles).
+        :return: A list of tweet lists aligned with the input queries.
+        """
+        if not queries:
+            return []
+        if not self.chroma_collection or not self.embedding_model:
+            logging.warning(
+                "ChromaDB collection or embedding model not initialized. Cannot find relevant tweets."
+            )
+            return [[] for _ in queries]
+        try:
+            query_embeddings = np.asarray(
+                self.embedding_model.encode(list(queries)), dtype=np.float32
+            )
+            if query_embeddings.size == 0:
+                logging.error("Failed to generate query embeddings.")
+                return [[] for _ in queries]
+            norms = np.linalg.norm(query_embeddings, axis=1, keepdims=True)
+            query_embeddings = query_embeddings / np.clip(norms, 1e-12, None)
+
+            results = self.chroma_collection.query(
+                query_embeddings=query_embeddings,
+                n_results=n_results,
+                include=["documents", "metadatas"],
+            )
+            documents = results.get("documents") or []
+            metadatas = results.get("metadatas") or []
+            batch_relevant = [
+                self._texts_from_results(
+                    documents[i] if i < len(documents) else [],
+                    metadatas[i] if i < len(metadatas) else [],
+                )
+                for i in range(max(len(documents), len(metadatas)))
+            ]
+            # Pad in case Chroma returned fewer rows than queries.
+            batch_relevant.extend(
+                [] for _ in range(len(queries) - len(batch_relevant))
+            )
+            logging.info(
+                f"Found relevant tweets for {len(queries)} queries in one batch."
+            )
+            return batch_relevant
+        except Exception as e:
+            logging.error(f"Error batch-querying ChromaDB: {e}")
+            return [[] for _ in queries]
+
+    @staticmethod
+    def _texts_from_results(documents, metadatas):
+        """
+        Extracts tweet texts from one query-result row.
+
+        Collections populated by the current populate_db.py store the tweet
+        as the document; older ones carry it in a metadata "text" field, so
+        that is kept as a fallback.
+        :param documents: Document strings for one query result row.
+        :param metadatas: Metadata dicts for the same row.
+        :return: A list of tweet texts.
+        """
+        texts = []
+        for i in range(max(len(documents or []), len(metadatas or []))):
+            doc = documents[i] if documents and i < len(documents) else None
+            if doc:
+                texts.append(doc)
+                continue
+            meta = metadatas[i] if metadatas and i < len(metadatas) else None
+            if meta and "text" in meta:
+                texts.append(meta["text"])
+        return texts
+
+    @staticmethod
+    def _clean_llm_response(raw_text):
+        """Strips <think> blocks and surrounding whitespace from model output."""
+        return _THINK_RE.sub("", raw_text.strip()).strip()
+
+    @staticmethod
+    def _truncate_content(text, max_chars=2000):
+        """Truncates text to at most max_chars, cutting at a word boundary.
+
+        A raw slice can split a word (or a multi-character sequence) in the
+        middle, wasting prompt tokens on a garbled tail; backing up to the
+        last whitespace keeps the snippet clean at near-zero cost.
+        """
+        if len(text) <= max_chars:
+            return text
+        # rsplit(None, 1) returns [] on whitespace-only input; fall back to
+        # the raw slice rather than raising.
+        parts = text[:max_chars].rsplit(None, 1)
+        truncated = parts[0] if parts else text[:max_chars]
+        return truncated + "..."
+
+    def _build_tweet_prompt(
         self, article_title, full_article_content, relevant_past_tweets
     ):
-        if not self.ollama_available:
-            logging.error("Ollama not available. Cannot generate tweet draft.")
-            return None
-
-        max_content_length = 2000
-        truncated_content = (
-            full_article_content[:max_content_length] + "..."
-            if len(full_article_content) > max_content_length
-            else full_article_content
-        )
+        truncated_content = self._truncate_content(full_article_content)
 
         if relevant_past_tweets:
             example_tweets_str = "\n".join(
@@ -148,41 +640,34 @@ class TweetGeneratorAgent:
         else:
             example_tweets_str = "No specifically relevant past examples found. Please generate content based on your core style."
 
-        prompt_template = """
-You are "Back to Basic," the AI personality behind a popular social media account on X (formerly Twitter).
-Your mission is to take current news articles and transform them into highly engaging, super-simplified explanations for a general audience. You're the knowledgeable yet approachable friend who breaks down complex stuff so anyone can get it, often with a relatable hook or a touch of lightheartedness.
-
-**Core "Back to Basic" Style Mandate:**
-(Mandate points 1-9 as before...)
-1.  **Hook 'Em Early:** Often start with a direct question (e.g., "What's happening with X?", "So, what's the deal with Y? 🤔") or a very brief, attention-grabbing statement about the news.
-2.  **Ultra-Simplicity:** Explain the core news as if you're talking to someone smart but completely unfamiliar with the topic. Define key terms or players if necessary (e.g., "The Federal Reserve ('the Fed') is America's central bank.").
-3.  **"Why it Matters" / "The Gist":** Crucially, explain *why* this news is important or relevant to the average person. How does it affect them or the world?
-4.  **Context is Key (Briefly!):** Provide just enough backstory or context to make the current event understandable (e.g., "For the past year or so, the Fed has been raising interest rates...").
-5.  **Anticipate Follow-up Questions:** Think about what a curious reader would ask next and try to address it concisely (e.g., "What investors are really listening for:", "Why are rate cuts often seen as positive?").
-6.  **Conversational & Engaging Tone:** Use a friendly, approachable, and conversational voice. A touch of humor or a relatable analogy is great where appropriate, but clarity is paramount. Avoid dry, academic, or overly formal language.
-7.  **Visual Appeal & X-Native:**
-    *   **Emojis:** Use relevant emojis strategically to add personality and break up text (📈, 🤔, 🌍).
-    *   **Hashtags:** ALWAYS include the signature `#BackToBasic`. Consider 1-2 other relevant, common hashtags if space allows.
-    *   **Conciseness:** Tweets must be suitable for X.
-8.  **Focus:** Distill the *single most important aspect* or the core development from the article for a general audience. Don't try to cover everything.
-9.  **No Jargon (or Explain It):** Avoid jargon. If a technical term is absolutely necessary, define it immediately in simple terms.
+        return "".join(
+            [
+                _PROMPT_HEAD,
+                example_tweets_str,
+                _PROMPT_MID,
+                article_title,
+                _PROMPT_TAIL1,
+                truncated_content,
+                _PROMPT_TAIL2,
+            ]
+        )
 
-Here are some relevant examples of past tweets that might help you with the style for this topic:
---- BEGIN RELEVANT EXAMPLES ---
-{example_tweets_formatted}
---- END RELEVANT EXAMPLES ---
+    def generate_tweet_draft(
+        self, article_title, full_article_content, relevant_past_tweets,
+        echo_stream=False,
+    ):
+        """Generates a tweet draft, streaming the Ollama response.
 
-**Current News Item:**
-Headline: {article_title}
-Article Snippet/Key Information: {article_content}
-(This content should ideally be a concise summary or the most critical paragraphs of the news story you want to explain)
+        The model's <think> block is filtered out on the fly, so with
+        echo_stream=True the first user-visible tokens appear as soon as the
+        model finishes reasoning instead of after the whole response.
+        """
+        if not self.ollama_available:
+            logging.error("Ollama not available. Cannot generate tweet draft.")
+            return None
 
-Your post here:
-"""
-        prompt = prompt_template.format(
-            article_title=article_title,
-            article_content=truncated_content,
-            example_tweets_formatted=example_tweets_str,
+        prompt = self._build_tweet_prompt(
+            article_title, full_article_content, relevant_past_tweets
         )
 
         if len(prompt) < 2000:
@@ -196,21 +681,93 @@ Your post here:
             logging.debug(f"Full prompt (length {len(prompt)}): {prompt}")
 
         try:
-            response = ollama.chat(
+            stream = _get_ollama_client().chat(
                 model=OLLAMA_MODEL_NAME,
                 messages=[{"role": "user", "content": prompt}],
+                stream=True,
             )
-            generated_text_raw = response["message"]["content"].strip()
-            # Remove <think> blocks
-            cleaned_text = re.sub(
-                r"<think>.*?</think>\s*", "", generated_text_raw, flags=re.DOTALL
-            ).strip()
+            think_filter = _ThinkStreamFilter()
+            visible_parts = []
+            for chunk in stream:
+                piece = think_filter.feed(chunk["message"]["content"])
+                if piece:
+                    visible_parts.append(piece)
+                    if echo_stream:
+                        print(piece, end="", flush=True)
+            piece = think_filter.flush()
+            if piece:
+                visible_parts.append(piece)
+                if echo_stream:
+                    print(piece, end="", flush=True)
+            if echo_stream and visible_parts:
+                print()
+            cleaned_text = self._clean_llm_response("".join(visible_parts))
             logging.info(f"Generated tweet draft (cleaned): {cleaned_text}")
             return cleaned_text
         except Exception as e:
             logging.error(f"Error generating tweet with Ollama: {e}")
             return None
 
+    async def generate_tweet_draft_async(
+        self, article_title, full_article_content, relevant_past_tweets, client=None
+    ):
+        """Async variant of generate_tweet_draft using ollama.AsyncClient.
+
+        Pass a shared client when issuing several generations concurrently
+        (e.g. via asyncio.gather); Ollama serves them in parallel up to its
+        OLLAMA_NUM_PARALLEL setting.
+        """
+        if not self.ollama_available:
+            logging.error("Ollama not available. Cannot generate tweet draft.")
+            return None
+
+        prompt = self._build_tweet_prompt(
+            article_title, full_article_content, relevant_past_tweets
+        )
+        if client is None:
+            import ollama
+
+            client = ollama.AsyncClient()
+        try:
+            response = await client.chat(
+                model=OLLAMA_MODEL_NAME,
+                messages=[{"role": "user", "content": prompt}],
+            )
+            cleaned_text = self._clean_llm_response(response["message"]["content"])
+            logging.info(f"Generated tweet draft (cleaned): {cleaned_text}")
+            return cleaned_text
+        except Exception as e:
+            logging.error(f"Error generating tweet with Ollama: {e}")
+            return None
+
+    def generate_tweet_drafts_batch(self, articles):
+        """Generates drafts for many articles with concurrent Ollama calls.
+
+        :param articles: A list of (article_title, full_article_content) pairs.
+        :return: A list of drafts (or None entries) aligned with the input.
+
+        Throughput scales roughly linearly up to OLLAMA_NUM_PARALLEL (e.g.
+        OLLAMA_NUM_PARALLEL=4 with OLLAMA_MAX_LOADED_MODELS=1 on the server).
+        """
+
+        relevant_lists = self.find_relevant_tweets_batch(
+            [title for title, _ in articles], n_results=3
+        )
+
+        async def _run_batch():
+            import ollama
+
+            client = ollama.AsyncClient()
+            tasks = [
+                self.generate_tweet_draft_async(
+                    title, content, relevant, client=client
+                )
+                for (title, content), relevant in zip(articles, relevant_lists)
+            ]
+            return await asyncio.gather(*tasks)
+
+        return asyncio.run(_run_batch())
+
     def generate_tweet_from_selected_article(self, article_url, article_title):
         if not article_url or not article_title:
             logging.warning("Article URL and title are required.")
@@ -233,11 +790,7 @@ Your post here:
         draft = self.generate_tweet_draft(article_title, full_content, relevant_tweets)
         return draft
 
-    def generate_image_prompt(self, article_title, generated_tweet_text):
-        if not self.ollama_available:
-            logging.error("Ollama not available. Cannot generate image prompt.")
-            return None
-
+    def _build_image_prompt(self, article_title, generated_tweet_text):
         prompt_template_image = """
 You are an assistant that creates descriptive prompts for an AI image generator (like DALL-E, Midjourney, or Grok's image capabilities).
 Based on the following news article title and the tweet generated about it, create a concise and vivid image prompt.
@@ -249,46 +802,77 @@ Generated Tweet: {tweet_text}
 
 Image Prompt for AI:
 """
-        prompt = prompt_template_image.format(
+        return prompt_template_image.format(
             article_title=article_title, tweet_text=generated_tweet_text
         )
 
+    def generate_image_prompt(self, article_title, generated_tweet_text):
+        if not self.ollama_available:
+            logging.error("Ollama not available. Cannot generate image prompt.")
+            return None
+
+        prompt = self._build_image_prompt(article_title, generated_tweet_text)
+
         logging.info(
             f"Generating image prompt with prompt for model {OLLAMA_MODEL_NAME}:\n{prompt}"
         )
 
         try:
-            response = ollama.chat(
+            response = _get_ollama_client().chat(
                 model=OLLAMA_MODEL_NAME,
                 messages=[{"role": "user", "content": prompt}],
             )
-            generated_image_prompt_raw = response["message"]["content"].strip()
-            # Remove <think> blocks
-            cleaned_image_prompt = re.sub(
-                r"<think>.*?</think>\s*",
-                "",
-                generated_image_prompt_raw,
-                flags=re.DOTALL,
-            ).strip()
+            cleaned_image_prompt = self._clean_llm_response(
+                response["message"]["content"]
+            )
             logging.info(f"Generated image prompt (cleaned): {cleaned_image_prompt}")
             return cleaned_image_prompt
         except Exception as e:
             logging.error(f"Error generating image prompt with Ollama: {e}")
             return None
 
-    def _display_in_text_editor(self, content, base_filename):
-        """Saves content to a file and attempts to open it in the default text editor."""
+    async def generate_image_prompt_async(
+        self, article_title, generated_tweet_text, client=None
+    ):
+        """Async variant of generate_image_prompt using ollama.AsyncClient."""
+        if not self.ollama_available:
+            logging.error("Ollama not available. Cannot generate image prompt.")
+            return None
+
+        prompt = self._build_image_prompt(article_title, generated_tweet_text)
+        if client is None:
+            import ollama
+
+            client = ollama.AsyncClient()
         try:
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            # Construct path to the 'output' directory, which is one level up from script_dir
-            output_dir = os.path.join(script_dir, "..", "output")
+            response = await client.chat(
+                model=OLLAMA_MODEL_NAME,
+                messages=[{"role": "user", "content": prompt}],
+            )
+            cleaned_image_prompt = self._clean_llm_response(
+                response["message"]["content"]
+            )
+            logging.info(f"Generated image prompt (cleaned): {cleaned_image_prompt}")
+            return cleaned_image_prompt
+        except Exception as e:
+            logging.error(f"Error generating image prompt with Ollama: {e}")
+            return None
 
-            # Ensure the output directory exists
-            if not os.path.exists(output_dir):
-                os.makedirs(output_dir)
-                logging.info(f"Created output directory: {output_dir}")
+    def _display_in_text_editor(self, content, base_filename):
+        """Saves content to a file and opens it in the default text editor.
+
+        The disk write and editor spawn run on a background thread so the
+        caller (e.g. the next Ollama generation) is not blocked on I/O; the
+        returned Future can be waited on when ordering matters.
+        """
+        return _IO_POOL.submit(self._write_and_open_file, content, base_filename)
 
-            file_path = os.path.join(output_dir, base_filename)
+    def _write_and_open_file(self, content, base_filename):
+        try:
+            # Ensure the output directory exists (no-op once created).
+            os.makedirs(_OUTPUT_DIR, exist_ok=True)
+
+            file_path = os.path.join(_OUTPUT_DIR, base_filename)
 
             with open(file_path, "w", encoding="utf-8") as f:
                 f.write(content)
@@ -309,11 +893,184 @@ Image Prompt for AI:
             )
 
 
+@dataclass
+class ArticleContext:
+    """Carries one article through the generation pipeline.
+
+    Populated once per selected article so the draft and image stages (and
+    any retries) reuse the same fetched content and relevant-tweet lookup
+    instead of redoing network or embedding work.
+    """
+
+    title: str
+    content: str
+    relevant: list = field(default_factory=list)
+
+
+def _collect_article_via_api(agent):
+    """Interactively selects a category and article; returns an ArticleContext
+    with the fetched full content, or None if the user skips or fetching fails."""
+    logging.info("Fetching news from API...")
+    categories = [
+        "business",
+        "entertainment",
+        "general",
+        "health",
+        "science",
+        "sports",
+        "technology",
+    ]
+    print("\nAvailable news categories:")
+    for i, cat in enumerate(categories):
+        print(f"{i + 1}. {cat.capitalize()}")
+
+    selected_category = None
+    while True:
+        try:
+            choice = input(f"Please select a category number (1-{len(categories)}): ")
+            category_index = int(choice) - 1
+            if 0 <= category_index < len(categories):
+                selected_category = categories[category_index]
+                break
+            else:
+                print(
+                    f"Invalid choice. Please enter a number between 1 and {len(categories)}."
+                )
+        except ValueError:
+            print("Invalid input. Please enter a number.")
+
+    logging.info(
+        f"Fetching top headlines for category: '{selected_category}' (US)..."
+    )
+    articles = agent.news_fetcher.get_top_headlines(
+        category=selected_category,
+        country="us",
+        page_size=10,
+    )
+
+    if not articles:
+        logging.warning(
+            f"No articles found for category '{selected_category}' or an error occurred."
+        )
+        return None
+
+    print(f"\nTop headlines for {selected_category.capitalize()}:")
+    for i, article in enumerate(articles):
+        print(f"{i + 1}. {article['title']}")
+
+    selected_url = None
+    selected_title = None
+    while True:
+        try:
+            article_choice_str = input(
+                f"Select an article number to get the full story (1-{len(articles)}), or 0 to skip: "
+            )
+            article_choice = int(article_choice_str)
+            if article_choice == 0:
+                logging.info("User skipped fetching full article via API.")
+                break
+            article_index = article_choice - 1
+            if 0 <= article_index < len(articles):
+                selected_url = articles[article_index]["url"]
+                selected_title = articles[article_index]["title"]
+                break
+            else:
+                print(
+                    f"Invalid article number. Please enter a number between 1 and {len(articles)}, or 0 to skip."
+                )
+        except ValueError:
+            print("Invalid input. Please enter a number.")
+
+    if not (selected_url and selected_title):
+        logging.info("No article selected via API for tweet generation.")
+        return None
+
+    logging.info(f"User selected article via API: '{selected_title}'")
+    retrieved_content = agent.news_fetcher.get_full_article_content(selected_url)
+    if not retrieved_content:
+        logging.error(f"Could not retrieve full content for {selected_url} via API.")
+        return None
+    return ArticleContext(title=selected_title, content=retrieved_content)
+
+
+def _read_multiline_content():
+    content_lines = []
+    while True:
+        try:
+            line = input()
+            content_lines.append(line)
+        except EOFError:
+            break
+    return "\n".join(content_lines).strip()
+
+
+def _collect_article_manually():
+    """Prompts for title and content; returns an ArticleContext."""
+    logging.info("Entering news story manually...")
+    print("\nPlease provide the details for your news story:")
+    title = ""
+    while not title:
+        title = input("Enter the article title: ").strip()
+        if not title:
+            print("Article title cannot be empty.")
+
+    print(
+        "Enter the full article content. Press Ctrl+D (Unix) or Ctrl+Z then Enter (Windows) on a new line when done:"
+    )
+    content = _read_multiline_content()
+    while not content:
+        print("Article content cannot be empty.")
+        print(
+            "Re-enter the full article content. Press Ctrl+D (Unix) or Ctrl+Z then Enter (Windows) on a new line when done:"
+        )
+        content = _read_multiline_content()
+
+    logging.info(f"User provided manual article: '{title}'")
+    return ArticleContext(title=title, content=content)
+
+
+def _run_generation(agent, article):
+    """Generates the draft tweet and image prompt for a populated context."""
+    logging.info(f"Proceeding to generate tweet for: '{article.title}'")
+
+    article.relevant = agent.find_relevant_tweets(article.title, n_results=3)
+    print("\nGenerated Draft Tweet:")
+    draft_tweet = agent.generate_tweet_draft(
+        article.title,
+        article.content,
+        article.relevant,
+        echo_stream=True,
+    )
+
+    if not draft_tweet:
+        logging.error(
+            f"Failed to generate a draft tweet for the selected article: {article.title}"
+        )
+        return
+
+    logging.info(
+        f"\n--- GENERATED DRAFT TWEET ---\n{draft_tweet}\n------------------------------"
+    )
+    agent._display_in_text_editor(draft_tweet, "generated_tweet.txt")
+
+    logging.info(f"Attempting to generate image prompt for: {article.title}")
+    image_prompt = agent.generate_image_prompt(article.title, draft_tweet)
+
+    if image_prompt:
+        logging.info(
+            f"\n--- GENERATED IMAGE PROMPT ---\n{image_prompt}\n-----------------------------"
+        )
+        print(f"\nSuggested Image Prompt for Grok:\n{image_prompt}")
+        agent._display_in_text_editor(image_prompt, "generated_image_prompt.txt")
+    else:
+        logging.warning(f"Could not generate an image prompt for: {article.title}")
+
+
 if __name__ == "__main__":
     logging.info("--- Interactive Tweet Generator Agent ---")
     agent = TweetGeneratorAgent()
 
-    if not agent.news_fetcher or not agent.news_fetcher.newsapi:
+    if not agent.news_fetcher or not agent.news_fetcher.api_key:
         logging.error("News fetcher component is not available. Exiting.")
     elif not agent.embedding_model:
         logging.error("Embedding model is not available. Exiting.")
@@ -328,7 +1085,7 @@ if __name__ == "__main__":
 
     if not (
         agent.news_fetcher
-        and agent.news_fetcher.newsapi
+        and agent.news_fetcher.api_key
         and agent.ollama_available
         and agent.embedding_model
     ):
@@ -349,199 +1106,14 @@ if __name__ == "__main__":
             if input_method_choice not in ["1", "2"]:
                 print("Invalid choice. Please enter 1 or 2.")
 
-        final_selected_article_title = None
-        final_full_article_content = None
-        operation_successful = False
-
         if input_method_choice == "1":
-            logging.info("Fetching news from API...")
-            categories = [
-                "business",
-                "entertainment",
-                "general",
-                "health",
-                "science",
-                "sports",
-                "technology",
-            ]
-            print("\nAvailable news categories:")
-            for i, cat in enumerate(categories):
-                print(f"{i + 1}. {cat.capitalize()}")
-
-            selected_category_api = None
-            while True:
-                try:
-                    choice = input(
-                        f"Please select a category number (1-{len(categories)}): "
-                    )
-                    category_index = int(choice) - 1
-                    if 0 <= category_index < len(categories):
-                        selected_category_api = categories[category_index]
-                        break
-                    else:
-                        print(
-                            f"Invalid choice. Please enter a number between 1 and {len(categories)}."
-                        )
-                except ValueError:
-                    print("Invalid input. Please enter a number.")
-
-            logging.info(
-                f"Fetching top headlines for category: '{selected_category_api}' (US)..."
-            )
-            articles_api = agent.news_fetcher.get_top_headlines(
-                category=selected_category_api,
-                country="us",
-                page_size=10,
-            )
-
-            if not articles_api:
-                logging.warning(
-                    f"No articles found for category '{selected_category_api}' or an error occurred."
-                )
-                operation_successful = False
-            else:
-                print(f"\nTop headlines for {selected_category_api.capitalize()}:")
-                for i, article_api in enumerate(articles_api):
-                    print(f"{i + 1}. {article_api['title']}")
-
-                selected_article_url_api = None
-                selected_article_title_api = None
-                while True:
-                    try:
-                        article_choice_str = input(
-                            f"Select an article number to get the full story (1-{len(articles_api)}), or 0 to skip: "
-                        )
-                        article_choice = int(article_choice_str)
-                        if article_choice == 0:
-                            logging.info("User skipped fetching full article via API.")
-                            operation_successful = False
-                            break
-                        article_index = article_choice - 1
-                        if 0 <= article_index < len(articles_api):
-                            selected_article_url_api = articles_api[article_index][
-                                "url"
-                            ]
-                            selected_article_title_api = articles_api[article_index][
-                                "title"
-                            ]
-                            break
-                        else:
-                            print(
-                                f"Invalid article number. Please enter a number between 1 and {len(articles_api)}, or 0 to skip."
-                            )
-                    except ValueError:
-                        print("Invalid input. Please enter a number.")
-
-                if selected_article_url_api and selected_article_title_api:
-                    logging.info(
-                        f"User selected article via API: '{selected_article_title_api}'"
-                    )
-                    retrieved_content = agent.news_fetcher.get_full_article_content(
-                        selected_article_url_api
-                    )
-                    if retrieved_content:
-                        final_selected_article_title = selected_article_title_api
-                        final_full_article_content = retrieved_content
-                        operation_successful = True
-                    else:
-                        logging.error(
-                            f"Could not retrieve full content for {selected_article_url_api} via API."
-                        )
-                        operation_successful = False
-                else:
-                    logging.info("No article selected via API for tweet generation.")
-                    operation_successful = False
-
-        elif input_method_choice == "2":
-            logging.info("Entering news story manually...")
-            print("\nPlease provide the details for your news story:")
-            title_manual = ""
-            while not title_manual:
-                title_manual = input("Enter the article title: ").strip()
-                if not title_manual:
-                    print("Article title cannot be empty.")
-
-            print(
-                "Enter the full article content. Press Ctrl+D (Unix) or Ctrl+Z then Enter (Windows) on a new line when done:"
-            )
-            content_manual_lines = []
-            while True:
-                try:
-                    line = input()
-                    content_manual_lines.append(line)
-                except EOFError:
-                    break
-            content_manual = "\n".join(content_manual_lines).strip()
-            while not content_manual:
-                print("Article content cannot be empty.")
-                print(
-                    "Re-enter the full article content. Press Ctrl+D (Unix) or Ctrl+Z then Enter (Windows) on a new line when done:"
-                )
-                content_manual_lines = []
-                while True:
-                    try:
-                        line = input()
-                        content_manual_lines.append(line)
-                    except EOFError:
-                        break
-                content_manual = "\n".join(content_manual_lines).strip()
-
-            final_selected_article_title = title_manual
-            final_full_article_content = content_manual
-            operation_successful = True
-            logging.info(
-                f"User provided manual article: '{final_selected_article_title}'"
-            )
-
-        if (
-            operation_successful
-            and final_selected_article_title
-            and final_full_article_content
-        ):
-            logging.info(
-                f"Proceeding to generate tweet for: '{final_selected_article_title}'"
-            )
-
-            relevant_tweets = agent.find_relevant_tweets(
-                final_selected_article_title, n_results=3
-            )
-            draft_tweet = agent.generate_tweet_draft(
-                final_selected_article_title,
-                final_full_article_content,
-                relevant_tweets,
-            )
-
-            if draft_tweet:
-                logging.info(
-                    f"\n--- GENERATED DRAFT TWEET ---\n{draft_tweet}\n------------------------------"
-                )
-                print(f"\nGenerated Draft Tweet:\n{draft_tweet}")
-                agent._display_in_text_editor(draft_tweet, "generated_tweet.txt")
-
-                logging.info(
-                    f"Attempting to generate image prompt for: {final_selected_article_title}"
-                )
-                image_prompt = agent.generate_image_prompt(
-                    final_selected_article_title, draft_tweet
-                )
+            article_context = _collect_article_via_api(agent)
+        else:
+            article_context = _collect_article_manually()
 
-                if image_prompt:
-                    logging.info(
-                        f"\n--- GENERATED IMAGE PROMPT ---\n{image_prompt}\n-----------------------------"
-                    )
-                    print(f"\nSuggested Image Prompt for Grok:\n{image_prompt}")
-                    agent._display_in_text_editor(
-                        image_prompt, "generated_image_prompt.txt"
-                    )
-                else:
-                    logging.warning(
-                        f"Could not generate an image prompt for: {final_selected_article_title}"
-                    )
-            else:
-                logging.error(
-                    f"Failed to generate a draft tweet for the selected article: {final_selected_article_title}"
-                )
-        elif not operation_successful:
+        if article_context:
+            _run_generation(agent, article_context)
+        else:
             logging.info(
                 "No article content available or operation skipped, so no tweet generated."
             )
@@ -1,11 +1,40 @@
+import asyncio
+import functools
 import logging
 import os
 import platform
-import re  # Added for sanitizing filenames
 import subprocess
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 
-from newsapi import NewsApiClient
-from newspaper import Article  # Added for fetching full article content
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from newspaper import Article  # Fallback parser for full article content
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+try:
+    # orjson decodes NewsAPI's nested article arrays several times faster
+    # than the stdlib json module; fall back to response.json() without it.
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    # Preferred extraction path: readability-lxml for main-content detection
+    # on top of lxml's libxml2 C parser, which parses full HTML pages several
+    # times faster than newspaper's pipeline.
+    import lxml.html
+    from lxml.html import HTMLParser
+    from readability import Document
+
+    _LXML_PARSER = HTMLParser(encoding="utf-8")
+except ImportError:
+    _LXML_PARSER = None
 
 # Configure logging
 logging.basicConfig(
@@ -14,25 +43,150 @@ logging.basicConfig(
 
 # --- Configuration ---
 NEWS_API_KEY = os.environ.get("NEWS_API_KEY")
+TOP_HEADLINES_URL = "https://newsapi.org/v2/top-headlines"
 # --- End Configuration ---
 
+# Shared HTTP session with keep-alive and connection pooling: repeat fetches
+# from the same publisher reuse the TCP/TLS connection instead of paying a
+# full handshake per article.
+_SESSION = requests.Session()
+_SESSION.headers["User-Agent"] = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/124.0 Safari/537.36"
+)
+_adapter_kwargs = {
+    "pool_connections": 16,
+    "pool_maxsize": 32,
+    "max_retries": Retry(total=2, backoff_factor=0.2),
+}
+try:
+    # On-disk HTTP cache honoring ETag/Cache-Control: a revalidated page
+    # costs a headers-only 304 exchange, a fresh one costs a disk read.
+    # CacheControlAdapter subclasses HTTPAdapter, so caching layers on top
+    # of the tuned pool/retry transport instead of replacing it.
+    from cachecontrol import CacheControlAdapter
+    from cachecontrol.caches.file_cache import FileCache
+
+    _adapter = CacheControlAdapter(
+        cache=FileCache(".http_cache"), cache_etags=True, **_adapter_kwargs
+    )
+except ImportError:
+    _adapter = HTTPAdapter(**_adapter_kwargs)
+_SESSION.mount("https://", _adapter)
+_SESSION.mount("http://", _adapter)
+del _adapter, _adapter_kwargs
+
+# Deletion table for characters that are invalid in filenames; built once so
+# sanitizing a title is a single C-level translate instead of a regex pass.
+_FORBIDDEN_FN_CHARS = str.maketrans("", "", '\\/*?:"<>|')
+
+# Resolve the platform-specific file opener once at import -- the OS does not
+# change between saves. Popen (unlike call) returns immediately, so the
+# viewer process never blocks the CLI.
+if platform.system() == "Windows":
+    _OPEN_FILE = os.startfile
+elif platform.system() == "Darwin":
+
+    def _OPEN_FILE(path):
+        subprocess.Popen(["open", path])
+
+else:
+
+    def _OPEN_FILE(path):
+        subprocess.Popen(["xdg-open", path])
+
+# Top-headline responses barely change minute-to-minute, so identical
+# requests within the TTL are served from memory instead of paying a full
+# HTTPS round trip on every menu navigation.
+_HEADLINE_CACHE = {}
+_HEADLINE_CACHE_TTL = 300  # seconds
+_HEADLINE_CACHE_MAX = 64
+
+# Single worker that runs the asyncio prefetch loop, so concurrent downloads
+# can overlap with the blocking input() prompts in the CLI.
+_PREFETCH_POOL = ThreadPoolExecutor(max_workers=1)
+
+
+async def _fetch_html(session, url):
+    try:
+        async with session.get(url) as resp:
+            # Don't hand 404/500/paywall pages to the parsers as if they
+            # were article HTML.
+            resp.raise_for_status()
+            return await resp.read()
+    except Exception as e:
+        logging.debug(f"Prefetch of {url} failed: {e}")
+        return None
+
+
+async def _prefetch_all(urls):
+    connector = aiohttp.TCPConnector(limit=16, ttl_dns_cache=300)
+    timeout = aiohttp.ClientTimeout(total=10)
+    async with aiohttp.ClientSession(
+        connector=connector,
+        timeout=timeout,
+        headers={"User-Agent": _SESSION.headers["User-Agent"]},
+    ) as session:
+        results = await asyncio.gather(
+            *[_fetch_html(session, url) for url in urls], return_exceptions=True
+        )
+    return {
+        url: html
+        for url, html in zip(urls, results)
+        if isinstance(html, (bytes, bytearray)) and html
+    }
+
+
+def prefetch_articles(urls):
+    """
+    Starts downloading all article URLs concurrently in the background.
+
+    Network wait is overlapped across the URLs (and with the user's article
+    selection), so wall time is roughly max(latency) instead of sum(latency).
+    :param urls: The article URLs to prefetch.
+    :return: A Future resolving to a dict of url -> HTML bytes (failed or
+             unavailable fetches are simply absent).
+    """
+    if aiohttp is None or not urls:
+        completed = Future()
+        completed.set_result({})
+        return completed
+    return _PREFETCH_POOL.submit(asyncio.run, _prefetch_all(list(urls)))
+
+
+@functools.lru_cache(maxsize=256)
+def _fetch_parsed(article_url):
+    """
+    Downloads and parses an article, memoized per URL for the process.
+
+    Repeat requests for the same article cost a dict lookup instead of a
+    download plus two parser passes; the HTTP layer below additionally
+    serves revalidated responses from the on-disk cache across runs.
+    :param article_url: The URL of the article.
+    :return: The extracted article text.
+    """
+    response = _SESSION.get(article_url, timeout=10)
+    # Raise on error responses so dead links surface through the caller's
+    # except path instead of readability returning 404-page boilerplate as
+    # "content" -- which the lru_cache (and disk cache) would then pin.
+    response.raise_for_status()
+    return NewsFetcher._parse_article_html(article_url, response.content)
+
 
 class NewsFetcher:
     def __init__(self, api_key=None):  # Made api_key optional
         # Prioritize passed api_key, then environment variable
         effective_api_key = api_key if api_key is not None else NEWS_API_KEY
         if not effective_api_key:
-            self.newsapi = None
+            self.api_key = None
             logging.error(
                 "News API key not provided via argument or NEWS_API_KEY environment variable. NewsFetcher will not work."
             )
             return
-        try:
-            self.newsapi = NewsApiClient(api_key=effective_api_key)
-            logging.info("NewsApiClient initialized successfully.")
-        except Exception as e:
-            self.newsapi = None
-            logging.error(f"Failed to initialize NewsApiClient: {e}")
+        # The REST endpoint is called directly through the pooled session; no
+        # client object to construct.
+        self.api_key = effective_api_key
+        logging.info("NewsFetcher initialized successfully.")
 
     def get_top_headlines(
         self,
@@ -54,22 +208,41 @@ class NewsFetcher:
         :param page_size: The number of results to return per page (request). 20 is the default, 100 is the maximum.
         :return: A list of articles, or None if an error occurs.
         """
-        if not self.newsapi:
-            logging.error("NewsApiClient not initialized. Cannot fetch headlines.")
+        if not self.api_key:
+            logging.error("News API key not configured. Cannot fetch headlines.")
             return None
 
+        cache_key = (query, sources, category, language, country, page_size)
+        cached = _HEADLINE_CACHE.get(cache_key)
+        if cached and time.monotonic() - cached[0] < _HEADLINE_CACHE_TTL:
+            logging.info(
+                f"Serving top headlines for {cache_key} from cache "
+                f"(TTL {_HEADLINE_CACHE_TTL}s)."
+            )
+            return cached[1]
+
         try:
             logging.info(
                 f"Fetching top headlines with params: q='{query}', sources='{sources}', category='{category}', lang='{language}', country='{country}', page_size={page_size}"
             )
-            top_headlines = self.newsapi.get_top_headlines(
-                q=query,
-                sources=sources,
-                category=category,
-                language=language,
-                country=country,
-                page_size=page_size,
+            params = {
+                "q": query,
+                "sources": sources,
+                "category": category,
+                "language": language,
+                "country": country,
+                "pageSize": page_size,
+            }
+            response = _SESSION.get(
+                TOP_HEADLINES_URL,
+                params={k: v for k, v in params.items() if v is not None},
+                headers={"X-Api-Key": self.api_key},
+                timeout=10,
             )
+            if orjson is not None:
+                top_headlines = orjson.loads(response.content)
+            else:
+                top_headlines = response.json()
 
             if top_headlines.get("status") == "ok":
                 articles = top_headlines.get("articles", [])
@@ -83,6 +256,10 @@ class NewsFetcher:
                     }
                     for article in articles
                 ]
+                if len(_HEADLINE_CACHE) >= _HEADLINE_CACHE_MAX:
+                    # Evict the oldest entry (dicts preserve insertion order).
+                    _HEADLINE_CACHE.pop(next(iter(_HEADLINE_CACHE)))
+                _HEADLINE_CACHE[cache_key] = (time.monotonic(), processed_articles)
                 return processed_articles
             else:
                 logging.error(
@@ -93,10 +270,52 @@ class NewsFetcher:
             logging.error(f"An exception occurred while fetching headlines: {e}")
             return None
 
-    def get_full_article_content(self, article_url):
+    @staticmethod
+    def _parse_article_html(article_url, html_bytes):
+        """
+        Parses article HTML into plain text, trying readability first.
+        :param article_url: The URL the HTML came from (for newspaper).
+        :param html_bytes: The raw HTML of the article page.
+        :return: The extracted article text.
+        """
+        text = NewsFetcher._extract_main_text(html_bytes)
+        if not text:
+            # Fallback: newspaper's (slower) extraction on the same HTML.
+            article_obj = Article(article_url)
+            article_obj.set_html(html_bytes)
+            article_obj.parse()
+            text = article_obj.text
+        return text
+
+    @staticmethod
+    def _extract_main_text(html_bytes):
+        """
+        Extracts the main article text via readability + lxml's C parser.
+        :param html_bytes: The raw HTML of the article page.
+        :return: The extracted text, or None if extraction fails/unavailable.
+        """
+        if _LXML_PARSER is None:
+            return None
+        try:
+            summary_html = Document(html_bytes).summary()
+            doc = lxml.html.fromstring(
+                summary_html.encode("utf-8"), parser=_LXML_PARSER
+            )
+            text = doc.text_content().strip()
+            return text or None
+        except Exception as e:
+            logging.warning(f"readability/lxml extraction failed: {e}")
+            return None
+
+    def get_full_article_content(self, article_url, html=None):
         """
         Fetches and parses the full content of an article from its URL.
+
+        The HTML is fetched once and parsed with readability + lxml (fast C
+        parser); newspaper is only used as a fallback when that fails.
         :param article_url: The URL of the article.
+        :param html: Optional pre-downloaded HTML bytes (e.g. from
+                     prefetch_articles), skipping the network fetch.
         :return: The full text content of the article, or None if an error occurs.
         """
         if not article_url:
@@ -104,16 +323,12 @@ class NewsFetcher:
             return None
         try:
             logging.info(f"Fetching full content for article: {article_url}")
-            # Initialize Article object
-            article_obj = Article(article_url)
-            # Download HTML content
-            article_obj.download()
-            # Parse the article to extract main content
-            article_obj.parse()
-            logging.info(
-                f"Successfully fetched and parsed article: {article_obj.title}"
-            )
-            return article_obj.text
+            if html:
+                text = self._parse_article_html(article_url, html)
+            else:
+                text = _fetch_parsed(article_url)
+            logging.info(f"Successfully fetched and parsed article: {article_url}")
+            return text
         except Exception as e:
             logging.error(
                 f"An exception occurred while fetching full article content from {article_url}: {e}"
@@ -130,7 +345,7 @@ if __name__ == "__main__":
         logging.error(
             "NEWS_API_KEY environment variable not set. Please set it to your News API key to run this script."
         )
-    elif not fetcher.newsapi:  # Check if initialization failed for other reasons
+    elif not fetcher.api_key:  # Check if initialization failed for other reasons
         logging.error(
             "News fetcher could not be initialized. This might be due to an invalid API key or network issues. Exiting."
         )
@@ -202,6 +417,12 @@ if __name__ == "__main__":
             for i, article_item in enumerate(articles):
                 print(f"{i + 1}. {article_item['title']}")
 
+            # Start downloading every listed article while the user decides;
+            # by selection time the HTML is usually already in hand.
+            prefetch_future = prefetch_articles(
+                [a["url"] for a in articles if a.get("url")]
+            )
+
             selected_article_url = None
             selected_article_title = None
             article_choice = -1  # Initialize to a value that's not 0
@@ -240,28 +461,33 @@ if __name__ == "__main__":
                 logging.info(
                     f"Fetching full story for: {selected_article_title} ({selected_article_url})"
                 )
-                full_content = fetcher.get_full_article_content(selected_article_url)
+                try:
+                    prefetched = prefetch_future.result()
+                except Exception as e:
+                    logging.warning(f"Article prefetch failed: {e}")
+                    prefetched = {}
+                full_content = fetcher.get_full_article_content(
+                    selected_article_url, html=prefetched.get(selected_article_url)
+                )
 
                 if full_content:
                     logging.info("Full article content fetched successfully.")
                     logging.info(f"Content length: {len(full_content)} characters.")
-                    sanitized_title = re.sub(
-                        r'[\\/*?:"<>|]', "", selected_article_title or ""
+                    sanitized_title = (selected_article_title or "").translate(
+                        _FORBIDDEN_FN_CHARS
                     )
                     filename = f"{sanitized_title[:100]}.txt"
                     try:
-                        with open(filename, "w", encoding="utf-8") as f:
-                            f.write(full_content)
+                        # Encode once and write the bytes directly: one write
+                        # syscall instead of TextIOWrapper's incremental
+                        # encode-and-flush passes.
+                        data = full_content.encode("utf-8")
+                        with open(filename, "wb", buffering=0) as f:
+                            f.write(data)
                         logging.info(f"Full article content saved to: {filename}")
                         print(f"\n--- Full article content saved to: {filename} ---")
                         try:
-                            current_os = platform.system()
-                            if current_os == "Windows":
-                                os.startfile(filename)
-                            elif current_os == "Darwin":
-                                subprocess.call(["open", filename])
-                            else:
-                                subprocess.call(["xdg-open", filename])
+                            _OPEN_FILE(filename)
                             logging.info(
                                 f"Attempted to open {filename} in the default editor."
                             )